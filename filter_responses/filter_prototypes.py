@@ -3,11 +3,41 @@
 """
 
 import numpy as np
+from functools import lru_cache
 from scipy import signal
 
 
 # TODO: Conversions from lowpass to highpass, bandpass and bandreject filters are to be added.
 
+def _quantize_ripple(eps):
+    """
+    Quantizes the ripple ``eps`` in decibels to milli-decibels so that the nearby ripple values of a slider share the
+    same cached design of :func:`_cached_cheby1`.
+    """
+    return round(float(eps), 3)
+
+
+@lru_cache(maxsize=64)
+def _cached_butter(n):
+    """
+    Cached coefficients of :math:`n^{th}` order Butterworth low-pass filter with 1 rad/sec cutoff frequency.
+
+    ``n`` is expected to be an int.
+    """
+    return signal.butter(n, 1., btype='low', analog=True)
+
+
+@lru_cache(maxsize=256)
+def _cached_cheby1(n, eps):
+    """
+    Cached coefficients of :math:`n^{th}` order Chebyshev low-pass filter with ``eps`` decibels ripple and 1 rad/sec
+    cutoff frequency.
+
+    ``n`` is expected to be an int and ``eps`` to be quantized by :func:`_quantize_ripple`.
+    """
+    return signal.cheby1(n, eps, 1., btype='low', analog=True)
+
+
 def coefficients2hs(a, b, n=1):
     """
     Converts filter coefficients to transfer function in s-domain
@@ -26,10 +56,17 @@ def coefficients2hs(a, b, n=1):
     callable
         s-domain transfer function :func:`hs` of the filter.
 
+    Note
+    ----
+    The denominator is evaluated with Horner's method, i.e. with ``n`` multiply-adds and without any powers of ``s``.
     """
+    bc = np.asarray(b)[int(n)::-1]  # Denominator coefficients from the highest degree to the lowest.
 
     def hs(s):
-        return a / np.sum([b[k] * s ** k for k in range(int(n), -1, -1)], axis=0)
+        den = bc[0]
+        for c in bc[1:]:
+            den = den * s + c
+        return a / den
 
     return hs
 
@@ -50,7 +87,7 @@ def hs2hw(hs):
     """
 
     def hw(w):
-        return hs(1j * w)
+        return hs(1j * np.asarray(w, dtype=np.float64))
 
     return hw
 
@@ -99,6 +136,59 @@ def hw2hwphase(hw):
     return hwphase
 
 
+def hs2response(hs, deg=True):
+    """
+    Converts filter transfer function in s domain into magnitude and phase response function.
+
+    Parameters
+    ----------
+    hs : callable,
+        s-domain transfer function of the filter
+    deg : bool, optional
+        If True, the phase response is in degrees, otherwise in radians. (Default=True)
+
+    Returns
+    -------
+    callable
+        Response function :func:`response` of the filter returning the magnitude and phase responses
+        from a single evaluation of ``hs``. ``response`` is called either with the frequencies ``w`` or with the
+        precomputed ``s = 1j * w`` so that ``s`` can be shared by the filters evaluated on the same frequencies.
+    """
+
+    def response(w=None, s=None):
+        if s is None:
+            s = 1j * np.asarray(w, dtype=np.float64)
+        h = hs(s)
+        return np.abs(h), np.angle(h, deg=deg)
+
+    return response
+
+
+def filter_response(num, den, w):
+    """
+    Computes magnitude and phase responses of the filter.
+
+    The frequency response is evaluated by :func:`scipy.signal.freqs` in a single call, i.e. without composing
+    :func:`coefficients2hs`, :func:`hs2hw`, :func:`hw2hwmag` and :func:`hw2hwphase`.
+
+    Parameters
+    ----------
+    num : numpy.ndarray
+        Numerator coefficients of the filter in decreasing powers of s.
+    den : numpy.ndarray
+        Denominator coefficients of the filter in decreasing powers of s.
+    w : numpy.ndarray
+        Frequencies at which the responses are computed.
+
+    Returns
+    -------
+    tuple
+        Magnitude and phase (in degrees) responses of the filter at ``w``.
+    """
+    _, h = signal.freqs(num, den, worN=w)
+    return np.abs(h), np.angle(h, deg=True)
+
+
 def main():
     """
     Test function to test the functions of the module.
@@ -106,28 +196,16 @@ def main():
     import matplotlib.pyplot as plt
 
     def butter_hw_mag(w, n=4):
-        if not hasattr(butter_hw_mag, 'filter_func'):
-            a, b = signal.butter(n, 1., btype='low', analog=True)
-            butter_hw_mag.filter_func = hw2hwmag(hs2hw(coefficients2hs(a, b[::-1], n=n)))
-        return w, butter_hw_mag.filter_func(w)
+        return w, filter_response(*_cached_butter(n), w)[0]
 
     def butter_hw_phase(w, n=4):
-        if not hasattr(butter_hw_phase, 'filter_func'):
-            a, b = signal.butter(n, 1., btype='low', analog=True)
-            butter_hw_phase.filter_func = hw2hwphase(hs2hw(coefficients2hs(a, b[::-1], n=n)))
-        return w, butter_hw_mag.filter_func(w)
+        return w, filter_response(*_cached_butter(n), w)[1]
 
     def cheby_hw_mag(w, n=4, eps=1):
-        if not hasattr(cheby_hw_mag, 'filter_func'):
-            a, b = signal.cheby1(n, eps, 1., btype='low', analog=True)
-            cheby_hw_mag.filter_func = hw2hwmag(hs2hw(coefficients2hs(a, b[::-1], n=n)))
-        return w, cheby_hw_mag.filter_func(w)
+        return w, filter_response(*_cached_cheby1(n, _quantize_ripple(eps)), w)[0]
 
     def cheby_hw_phase(w, n=4, eps=1):
-        if not hasattr(cheby_hw_phase, 'filter_func'):
-            a, b = signal.cheby1(n, eps, 1., btype='low', analog=True)
-            cheby_hw_phase.filter_func = hw2hwphase(hs2hw(coefficients2hs(a, b[::-1], n=n)))
-        return w, cheby_hw_phase.filter_func(w)
+        return w, filter_response(*_cached_cheby1(n, _quantize_ripple(eps)), w)[1]
 
     # Compute responses
     domain = np.linspace(0, 5, 1001)
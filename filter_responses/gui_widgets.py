@@ -3,14 +3,20 @@
 """
 
 import sys
-from PyQt5.QtCore import Qt
-from PyQt5.QtWidgets import QApplication, QHBoxLayout, QLabel, QSizePolicy, QSlider, QSpacerItem, \
+from PyQt5.QtCore import QObject, QRunnable, Qt, QThreadPool, QTimer, pyqtSignal
+from PyQt5.QtWidgets import QApplication, QGridLayout, QHBoxLayout, QLabel, QSizePolicy, QSlider, QSpacerItem, \
     QVBoxLayout, QWidget
 import pyqtgraph as pg
 import numpy as np
+from collections import OrderedDict
 from inspect import signature
-from functools import partial
-from matplotlib.colors import CSS4_COLORS
+from itertools import cycle
+
+# Colors of the curves, cycled in order. The colors are distinct on the dark background of the plots.
+_CURVE_COLORS = ('#1f77b4', '#ff7f0e', '#2ca02c', '#d62728', '#9467bd', '#8c564b', '#e377c2', '#7f7f7f', '#bcbd22',
+                 '#17becf', '#aec7e8', '#ffbb78', '#98df8a', '#ff9896', '#c5b0d5', '#c49c94', '#f7b6d2', '#c7c7c7',
+                 '#dbdb8d', '#9edae5')
+_CURVE_CACHE_SIZE = 64  # Maximum number of curve data cached per function by :class:`Widget`
 
 
 class Slider(QWidget):
@@ -46,14 +52,13 @@ class Slider(QWidget):
         self.label = QLabel(self)
         self.slider = QSlider(self)
 
+        self.label.setStyleSheet('color: ' + self.color)
         self.verticalLayout.addWidget(self.label)
 
+        # A single expanding spacer aligns the slider to the right of the label.
         spacerItem = QSpacerItem(0, 10, QSizePolicy.Expanding, QSizePolicy.Minimum)
         self.horizontalLayout.addItem(spacerItem)
 
-        spacerItem1 = QSpacerItem(0, 10, QSizePolicy.Expanding, QSizePolicy.Minimum)
-        self.horizontalLayout.addItem(spacerItem1)
-
         self.slider.setOrientation(Qt.Vertical)
         self.horizontalLayout.addWidget(self.slider)
 
@@ -76,7 +81,6 @@ class Slider(QWidget):
         if self.data_type is int:
             self.value = int(self.value)
         self.label.setText("{0}={1:.4g}".format(self.name, self.value))
-        self.label.setStyleSheet('color: ' + self.color)
 
 
 class SliderBlock(QWidget):
@@ -94,9 +98,13 @@ class SliderBlock(QWidget):
     def __init__(self, sliders):
         super().__init__()
         self.sliders = sliders
-        self.horizontalLayout = QHBoxLayout(self)
-        for slider in self.sliders:
-            self.horizontalLayout.addWidget(slider)
+        self.gridLayout = QGridLayout(self)
+
+        # Suppress the repaints while the sliders are added so that the block is laid out once.
+        self.setUpdatesEnabled(False)
+        for col, slider in enumerate(self.sliders):
+            self.gridLayout.addWidget(slider, 0, col)
+        self.setUpdatesEnabled(True)
 
 
 class Widget(QWidget):
@@ -134,11 +142,32 @@ class Widget(QWidget):
         x-label of the plot. (Default='')
     ylabel : str, optional
         y-label of the plot. (Default='')
-        
+    tracking : bool, optional
+        If True, the curves are updated while the sliders are dragged, otherwise only when the sliders are released.
+        (Default=True)
+    background : bool, optional
+        If True, the functions are evaluated in the worker threads of the global thread pool and the curves are
+        updated as the evaluations finish, so that the GUI stays responsive for slowly evaluated functions.
+        (Default=False)
+    update_interval : int, optional
+        Minimum time in milliseconds between two updates of the curves while the sliders are moved. (Default=33)
+    use_opengl : bool, optional
+        If True, the plot window is drawn through an OpenGL viewport. (Default=False)
+
+    Note
+    ----
+    The functions may request the values shared by the widget through their ``shared`` attribute, a tuple of the
+    names of the keyword parameters to be given the shared values. A function with ``'s'`` in its ``shared`` is
+    given ``s = 1j * domain``, which is computed once by :meth:`_precompute_domain` instead of once per function per
+    update. Likewise, a function with ``'two_pi_x'`` in its ``shared`` is given ``two_pi_x = 2 * pi * domain`` in
+    single precision, which is ample for plotting and lets the function compute its curve in single precision. A
+    function with ``'out'`` in its ``shared`` is given the new data buffer of its curve and is expected to write its
+    values into it and return it. The parameters controlled by the sliders are never given the shared values.
     """
 
     def __init__(self, pairs, domain=np.linspace(0, 5, 1000), log_scale=False,
-                 win_title='', plt_title='', xlabel='', ylabel=''):
+                 win_title='', plt_title='', xlabel='', ylabel='', tracking=True,
+                 background=False, update_interval=33, use_opengl=False):
 
         super().__init__()
 
@@ -149,77 +178,262 @@ class Widget(QWidget):
         self.plt_title = plt_title
         self.xlabel = xlabel
         self.ylabel = ylabel
-        self.colors = tuple(CSS4_COLORS.values())
+        self.tracking = tracking
+        self.background = background
+        self.update_interval = update_interval
+        self.use_opengl = use_opengl
+        self.colors = _CURVE_COLORS
+        self._pen_pool = [pg.mkPen(color, width=1) for color in self.colors]  # Pens shared by the curves
 
         self.horizontalLayout = QHBoxLayout(self)
 
         self.win = pg.GraphicsWindow(title=self.win_title)
+        if self.use_opengl:
+            self.win.useOpenGL()
         self.palette = self.win.addPlot(title=self.plt_title)
         self.palette.setLabel('left', self.ylabel)
         self.palette.setLabel('bottom', self.xlabel)
         self.horizontalLayout.addWidget(self.win)
 
+        self.palette.addLegend(offset=(30, 30))
+        self.palette.setClipToView(True)
+        self.palette.setDownsampling(mode='peak', auto=True)
+        if self.log_scale:
+            self.palette.setLogMode(x=True, y=False)
+
         # Construct the sliders
         self.funcs = []
+        pens = cycle(self._pen_pool)
         for func, params in self.pairs:
             if func and params:
-                self.palette.addLegend(offset=np.random.randint(100))
-                if self.log_scale:
-                    self.palette.setLogMode(x=True, y=False)
-                pen_color = self.colors[np.random.randint(138)]
-                func.curve = self.palette.plot(pen=pen_color,
-                                               name=func.__name__)  # Get func curve
+                pen = next(pens)
+                pen_color = pen.color().name()
+                func.curve = self.palette.plot(pen=pen, name=func.__name__,
+                                               autoDownsample=True)  # Get func curve
                 func.sliders = []
                 for parameter, interval in params.items():
                     min_val, max_val = interval
                     slider = Slider(min_val, max_val, name=parameter, color=pen_color)
                     self.horizontalLayout.addWidget(slider)
                     func.sliders.append(slider)
+                func._param_names = frozenset(signature(func).parameters.keys())
+                func._slider_map = [(slider, slider.name) for slider in func.sliders
+                                    if slider.name in func._param_names]
+                # Shared values are handed only to the parameters requested by func through its ``shared``
+                # attribute and not controlled by the sliders.
+                shared = frozenset(getattr(func, 'shared', ())).difference(name for _, name in func._slider_map)
+                func._takes_s = 's' in shared
+                func._takes_two_pi_x = 'two_pi_x' in shared
+                func._takes_out = 'out' in shared
+                func._last_key = None  # Domain and parameters of the current data of func curve
+                func._pending_key = None  # Domain and parameters of the latest requested data of func curve
+                func._data_cache = OrderedDict()  # Least recently used curve data of func
                 self.funcs.append(func)
 
-        self.update()
+        self._curve_signals = _CurveSignals()
+        self._curve_signals.finished.connect(self._set_curve_data)
+        self._do_update()
+
+        # Slider changes are coalesced so that the curves are updated at most once in every ``update_interval``
+        # milliseconds.
+        self._update_timer = QTimer(self)
+        self._update_timer.setSingleShot(True)
+        self._update_timer.setInterval(self.update_interval)
+        self._update_timer.timeout.connect(self._do_update)
 
         for func in self.funcs:
             control_sliders = func.sliders
             for control_slider in control_sliders:
-                control_slider.slider.valueChanged.connect(lambda: self.update())
+                control_slider.slider.setTracking(self.tracking)
+                control_slider.slider.valueChanged.connect(self._schedule_update)
+
+    @property
+    def domain(self):
+        """
+        numpy.ndarray : Domain of the functions. Setting the domain recomputes the values shared by the functions,
+        invalidates the cached curve data and schedules an update of the curves.
+        """
+        return self._domain
+
+    @domain.setter
+    def domain(self, domain):
+        self._domain = domain
+        self._domain_version = getattr(self, '_domain_version', -1) + 1  # Domain part of the keys of curve data
+        self._precompute_domain()
+        for func in getattr(self, 'funcs', ()):
+            func._data_cache.clear()
+        if hasattr(self, '_update_timer'):
+            self._schedule_update()
+
+    def _precompute_domain(self):
+        """
+        Compute the complex frequencies ``s = 1j * domain`` and ``two_pi_x = 2 * pi * domain`` shared by the
+        functions, and the single precision copy of the domain handed to the plots.
+
+        This method is called by the setter of ``domain``.
+        """
+        self._s = 1j * np.asarray(self.domain, dtype=np.float64)
+        self._two_pi_x = (2 * np.pi * np.asarray(self.domain, dtype=np.float64)).astype(np.float32)
+        self._domain_f32 = np.asarray(self.domain, dtype=np.float32)  # Domain uploaded to the plots
 
-    def update(self):
+    def _schedule_update(self, *_):
+        """
+        Schedule an update of the curves unless one is already pending. The value emitted by the slider is ignored.
+        """
+        if not self._update_timer.isActive():
+            self._update_timer.start()
+
+    def _do_update(self):
         """
         Update the curve of the graphics windows.
         
-        This method is the callback function of the sliders. If the value of the slider is changed, 
-        this method is called immediately. 
+        If the value of a slider is changed, this method is called by the update timer started by
+        :meth:`_schedule_update`. With ``tracking`` disabled, the sliders change their values only when released.
         """
+        # Suspend auto-ranging and repaints so that they are performed once for all of the curves.
+        x_auto, y_auto = self.palette.vb.autoRangeEnabled()
+        self.palette.vb.disableAutoRange()
+        self.win.setUpdatesEnabled(False)
+
         for func in self.funcs:
-            # Get func curve and its control sliders
+            # Get func curve.
             curve = func.curve
-            control_sliders = func.sliders
 
-            # Read func control sliders and wrap func accordingly.
-            sig = signature(func)
-            params = dict()
-            for control_slider in control_sliders:
-                if control_slider.name in sig.parameters.keys():
-                    params[control_slider.name] = control_slider.value
-            func_ = partial(func, **params)
+            # Skip the func if neither the domain nor its control sliders are changed since the last update. The
+            # sliders are read in a fixed order, so the key is compared before the parameters of the func are built.
+            # The func is skipped as well if its evaluation for the same key is still running in the background. If
+            # the sliders are moved back to the plotted position, the key is marked as pending again, so that the
+            # results of the evaluations still running in the background are cached but not plotted.
+            key = (self._domain_version,) + tuple(control_slider.value for control_slider, _ in func._slider_map)
+            if key == func._last_key:
+                func._pending_key = key
+                continue
+            if self.background and key == func._pending_key:
+                continue
+            func._pending_key = key
+
+            # Reuse the data of the func curve if the sliders are moved back to a recent position. The sliders have
+            # a fixed number of positions, so their values are reproducible and need not be rounded for the key.
+            y = func._data_cache.get(key)
+            if y is not None:
+                func._data_cache.move_to_end(key)
+                curve.setData(x=self._domain_f32, y=y, skipFiniteCheck=True, connect='all')
+                func._last_key = key
+                continue
+            params = {name: value for (_, name), value in zip(func._slider_map, key[1:])}
+
+            # Compute new data of the func curve into a new buffer, which is kept in the cache of func. In the
+            # background mode, the curve is updated by :meth:`_set_curve_data` when the evaluation is finished.
+            out = np.empty(len(self.domain), dtype=np.float32)
+            if self.background:
+                QThreadPool.globalInstance().start(_CurveTask(self, func, key, params, out))
+            else:
+                self._set_curve_data(func, key, self._evaluate(func, params, out))
+
+        self.palette.vb.enableAutoRange(x=x_auto, y=y_auto)
+        self.win.setUpdatesEnabled(True)
+
+    def _evaluate(self, func, params, out):
+        """
+        Evaluate ``func`` with ``params`` on the domain into ``out``.
+
+        The func is evaluated on the whole domain at once; funcs that cannot handle arrays are evaluated point by
+        point. This method is called from the worker threads in the background mode, so it must not touch the plots.
+        """
+        kwargs = dict(params)
+        if func._takes_s:
+            kwargs['s'] = self._s
+        if func._takes_two_pi_x:
+            kwargs['two_pi_x'] = self._two_pi_x
+        if func._takes_out:
+            kwargs['out'] = out
+        try:
+            y = func(self.domain, **kwargs)
+            if y is not out:
+                np.copyto(out, y)
+        except Exception:
+            for i, x in enumerate(self.domain):
+                out[i] = func(x, **params)
+        return out
+
+    def _set_curve_data(self, func, key, y):
+        """
+        Cache the data ``y`` of the func curve computed for ``key`` and plot it unless the domain or the sliders of
+        func are changed since the evaluation is started. ``y`` is None if the evaluation in the background failed,
+        in which case the evaluation is retried by the next update.
+        """
+        if y is None:
+            if key == func._pending_key:
+                func._pending_key = None
+            return
+        func._data_cache[key] = y
+        if len(func._data_cache) > _CURVE_CACHE_SIZE:
+            func._data_cache.popitem(last=False)
+        if key == func._pending_key:
+            func.curve.setData(x=self._domain_f32, y=y, skipFiniteCheck=True, connect='all')
+            func._last_key = key
+
+
+class _CurveSignals(QObject):
+    """
+    Signals of :class:`_CurveTask`. ``finished`` is emitted with the func, the key and the data of the func curve.
+    """
+    finished = pyqtSignal(object, object, object)
 
-            # Compute new data of the func curve and update the curve.
-            data = np.array([func_(x) for x in self.domain])
-            curve.setData(x=self.domain, y=data)
+
+class _CurveTask(QRunnable):
+    """
+    Evaluation of a func curve of :class:`Widget` in a worker thread of the global thread pool.
+    """
+
+    def __init__(self, widget, func, key, params, out):
+        super().__init__()
+        self.widget = widget
+        self.func = func
+        self.key = key
+        self.params = params
+        self.out = out
+
+    def run(self):
+        y = None
+        try:
+            y = self.widget._evaluate(self.func, self.params, self.out)
+        finally:
+            self.widget._curve_signals.finished.emit(self.func, self.key, y)
 
 
 def main():
     # Launch Qt GUI application
     app = QApplication(sys.argv)
 
-    # Test function
-    def f1(x, k1=1., alpha1=0.5, f01=1., phi1=0., x01=0.):
-        return k1 * np.exp(-alpha1 * x) * np.cos(2 * np.pi * f01 * x + phi1) + x01
+    def damped_exp(x, k, alpha, f0, phi, two_pi_x=None):
+        """
+        Damped complex exponential ``k * exp((-alpha + 2j * pi * f0) * x + 1j * phi)``.
+
+        The exponential is computed in a single transcendental pass, in place for an array ``x``. ``two_pi_x`` is the
+        precomputed ``2 * pi * x``, from which the exponent is computed with a single multiplication. For the single
+        precision ``two_pi_x`` given by :class:`Widget`, the exponential is computed in single precision.
+        """
+        if two_pi_x is None:
+            two_pi_x = 2 * np.pi * np.asarray(x, dtype=np.float64)
+        z = np.multiply(1j * f0 - alpha / (2 * np.pi), two_pi_x)  # (-alpha + 2j * pi * f0) * x
+        if np.ndim(z) == 0:
+            return k * np.exp(z + 1j * phi)
+        z += 1j * phi
+        np.exp(z, out=z)
+        z *= k
+        return z
+
+    # Test function. If ``out`` is given, the result is written into ``out``.
+    def f1(x, k1=1., alpha1=0.5, f01=1., phi1=0., x01=0., two_pi_x=None, out=None):
+        return np.add(damped_exp(x, k1, alpha1, f01, phi1, two_pi_x).real, x01, out=out)
 
     # Test function
-    def f2(x, k2=1., alpha2=0.5, f02=1., phi2=0., x02=0.):
-        return k2 * np.exp(-alpha2 * x) * np.sin(2 * np.pi * f02 * x + phi2) + x02
+    def f2(x, k2=1., alpha2=0.5, f02=1., phi2=0., x02=0., two_pi_x=None, out=None):
+        return np.add(damped_exp(x, k2, alpha2, f02, phi2, two_pi_x).imag, x02, out=out)
+
+    # The test functions are given the precomputed ``two_pi_x`` and the data buffers of their curves.
+    f1.shared = f2.shared = ('two_pi_x', 'out')
 
     # Control sliders of test function.
     pair = ((f1, {'k1': (1, 10), 'alpha1': (0, 1), 'f01': (1, 10), 'phi1': (0, np.pi), 'x01': (0, 10)}),
@@ -4,8 +4,12 @@ responses of the filters.
 """
 
 from filter_responses.gui_widgets import *
+from filter_responses.gui_widgets import _CURVE_COLORS
 from filter_responses.filter_prototypes import *
+from filter_responses.filter_prototypes import _cached_butter, _cached_cheby1, _quantize_ripple
 from PyQt5.QtWidgets import QGroupBox, QGridLayout
+from collections import OrderedDict, defaultdict
+from itertools import cycle
 
 
 class GUI(QWidget):
@@ -52,43 +56,69 @@ class GUI(QWidget):
         If True, x-scale is logarithmic scale.
     win_labels : dict,
         The dictionary containing the labels and title, xlabel and ylabel of the grapihcs window. 
+    update_interval : int, optional
+        Minimum time in milliseconds between two updates of the curves while the sliders are moved. (Default=33)
+    use_opengl : bool, optional
+        If True, the graphics windows are drawn through OpenGL viewports. (Default=False)
     
     Note
     ----
+    The functions are matched to the graphics windows through their ``label`` attribute. A function without a
+    ``label`` attribute is called once with ``0`` and is expected to set its ``label`` during the call.
+
     Although the GUI is designed for filter characteristics, it may well be used for any function and for any 
-    characteristic.
+    characteristic. The functions having ``'s'`` in their ``shared`` attribute, a tuple of the names of the keyword
+    parameters to be given the shared values, are given ``s = 1j * domain`` unless ``s`` is controlled by a slider.
+    ``s`` is computed once by :meth:`_precompute_domain` instead of once per function per update.
     """
 
     def __init__(self, pairs, domain=np.linspace(0, 5, 1000), log_scale=False,
-                 win_labels=(), ):
+                 win_labels=(), update_interval=33, use_opengl=False):
         super().__init__()
         self.pairs = pairs
         self.domain = domain
         self.log_scale = log_scale
         self.win_labels = win_labels
-        self.colors = tuple(CSS4_COLORS.values())
+        self.update_interval = update_interval
+        self.use_opengl = use_opengl
+        self.colors = _CURVE_COLORS
+        self._pen_pool = [pg.mkPen(color, width=1) for color in self.colors]  # Pens shared by the curves
 
         # Match GUI windows with functions and sliders
-        # The functions are matched to GUI windows according to their labels.
+        # The functions are matched to GUI windows according to their labels. The functions are labeled in a single
+        # pass; the functions that do not have a ``label`` attribute yet are labeled by a dummy call.
+        funcs_by_label = defaultdict(list)
+        for func, params in self.pairs:
+            if not hasattr(func, 'label'):
+                func(0)  # Dummy call to label the func.
+            funcs_by_label[func.label].append((func, params))
+
         self.gui_wins = []
         self.gui_sliders = []
+        pens = cycle(self._pen_pool)
         for win_label in self.win_labels.keys():
             win = self.get_graphics_window(label=win_label, log_scale=self.log_scale)
             win.funcs = []
-            for func, params in self.pairs:
-                func(0)  # Dummy call to label the func.
-                if func.label == win_label:
-                    pen_color = self.colors[np.random.randint(138)]  # Randomly choose the plot color.
-                    func.curve = win.palette.plot(pen=pen_color,
-                                                  name=func.__name__)  # Get func curve
-                    win.funcs.append(func)
-                    if params:
-                        func.sliders = []  # Function sliders to control parameters of func
-                        for parameter, interval in params.items():
-                            min_val, max_val = interval
-                            slider = Slider(min_val, max_val, name=parameter, color=pen_color, data_type=type(min_val))
-                            func.sliders.append(slider)
-                            self.gui_sliders.append(slider)
+            for func, params in funcs_by_label[win_label]:
+                pen = next(pens)
+                pen_color = pen.color().name()
+                func.curve = win.palette.plot(pen=pen, name=func.__name__,
+                                              autoDownsample=True)  # Get func curve
+                func._buf = np.empty((2, len(self.domain)), dtype=np.float32)  # (x, y) data buffer of func curve
+                win.funcs.append(func)
+                func.sliders = []  # Function sliders to control parameters of func
+                if params:
+                    for parameter, interval in params.items():
+                        min_val, max_val = interval
+                        slider = Slider(min_val, max_val, name=parameter, color=pen_color, data_type=type(min_val))
+                        func.sliders.append(slider)
+                        self.gui_sliders.append(slider)
+                func._param_names = frozenset(signature(func).parameters.keys())
+                func._slider_map = [(slider, slider.name) for slider in func.sliders
+                                    if slider.name in func._param_names]
+                func._takes_s = 's' in frozenset(getattr(func, 'shared', ())).difference(
+                    name for _, name in func._slider_map)
+                func._last_key = None  # Domain and parameters of the current data of func curve
             self.gui_wins.append(win)
 
         # Construct the layout of GUI.
@@ -99,14 +129,19 @@ class GUI(QWidget):
         self.construct_layout(layout_shape=(num_rows, num_cols))
 
         # Plot the curves
-        self.update()
-
-        # Start the interaction
+        self._do_update()
+
+        # Start the interaction. Slider changes are coalesced so that the curves are updated at most once in
+        # every ``update_interval`` milliseconds.
+        self._update_timer = QTimer(self)
+        self._update_timer.setSingleShot(True)
+        self._update_timer.setInterval(self.update_interval)
+        self._update_timer.timeout.connect(self._do_update)
         for win in self.gui_wins:
             for func in win.funcs:
                 control_sliders = func.sliders
                 for control_slider in control_sliders:
-                    control_slider.slider.valueChanged.connect(lambda: self.update())
+                    control_slider.slider.valueChanged.connect(self._schedule_update)
 
     def construct_layout(self, layout_shape=(1, 1)):
         """
@@ -155,40 +190,159 @@ class GUI(QWidget):
         # It must be corrected to non-default parameter.
 
         win = pg.GraphicsWindow(title=window_title)
+        if self.use_opengl:
+            win.useOpenGL()
         win.palette = win.addPlot(title=self.win_labels[label][0])
         win.palette.setLabel('bottom', self.win_labels[label][1])
         win.palette.setLabel('left', self.win_labels[label][2])
-        win.palette.addLegend(offset=np.random.randint(100))
+        win.palette.addLegend(offset=(30, 30))
         win.palette.showGrid(x=True, y=True)
+        win.palette.setClipToView(True)
+        win.palette.setDownsampling(mode='peak', auto=True)
         if log_scale:
             win.palette.setLogMode(x=True, y=False)
         win.label = label
         return win
 
-    def update(self):
+    @property
+    def domain(self):
+        """
+        numpy.ndarray : Domain of the functions. Setting the domain recomputes the values shared by the functions,
+        reallocates the data buffers of the curves and schedules an update of the curves.
+        """
+        return self._domain
+
+    @domain.setter
+    def domain(self, domain):
+        self._domain = domain
+        self._domain_version = getattr(self, '_domain_version', -1) + 1  # Domain part of the keys of curve data
+        self._precompute_domain()
+        for win in getattr(self, 'gui_wins', ()):
+            for func in win.funcs:
+                func._buf = np.empty((2, len(domain)), dtype=np.float32)
+        if hasattr(self, '_update_timer'):
+            self._schedule_update()
+
+    def _precompute_domain(self):
+        """
+        Compute the complex frequencies ``s = 1j * domain`` shared by the functions and the single precision copy
+        of the domain handed to the plots.
+
+        This method is called by the setter of ``domain``.
+        """
+        self._s = 1j * np.asarray(self.domain, dtype=np.float64)
+        self._domain_f32 = np.asarray(self.domain, dtype=np.float32)  # Domain uploaded to the plots
+
+    def _schedule_update(self, *_):
+        """
+        Schedule an update of the curves unless one is already pending. The value emitted by the slider is ignored.
+        """
+        if not self._update_timer.isActive():
+            self._update_timer.start()
+
+    def _do_update(self):
         """
         Update the curves on the GUI.
         
         Update of the curve of each of the graphics window is performed according to the control sliders of the 
-        functions.
+        functions. This method is called by the update timer started by :meth:`_schedule_update`.
         """
+        # Evaluate the new data of the curves. The data of the shape of the domain is plotted from the single
+        # precision buffers of the curves.
+        curve_data = []
         for win in self.gui_wins:
             for func in win.funcs:
-                # Get the func curve and control sliders.
-                curve = func.curve
-                control_sliders = func.sliders
+                # Skip the func if neither the domain nor its control sliders are changed since the last update. The
+                # sliders are read in a fixed order, so the key is compared before the parameters of the func are built.
+                key = (self._domain_version,) + tuple(control_slider.value for control_slider, _ in func._slider_map)
+                if key == func._last_key:
+                    continue
+                params = {name: value for (_, name), value in zip(func._slider_map, key[1:])}
+                if func._takes_s:
+                    params['s'] = self._s
+
+                # The data is copied into the buffer of func only if its shape matches the domain; data of any other
+                # shape, e.g. a nyquist curve with its mirrored negative frequency branch, is plotted as returned.
+                x, y = func(self.domain, **params)
+                if np.shape(y) == func._buf[1].shape:
+                    np.copyto(func._buf[1], y)
+                    y = func._buf[1]
+                if x is self.domain:
+                    x = self._domain_f32
+                elif np.shape(x) == func._buf[0].shape:
+                    np.copyto(func._buf[0], x)
+                    x = func._buf[0]
+                curve_data.append((func, key, x, y))
+        if not curve_data:
+            return
+
+        # Set the data of the curves with the auto-ranging, the repaints and the view box signals of the windows
+        # suspended so that they are performed once for all of the curves.
+        auto_ranges = []
+        for win in self.gui_wins:
+            auto_ranges.append(win.palette.vb.autoRangeEnabled())
+            win.palette.vb.disableAutoRange()
+            win.palette.vb.blockSignals(True)
+            win.setUpdatesEnabled(False)
 
-                # Read func control sliders and warp func accordingly.
-                sig = signature(func)
-                params = dict()
-                for control_slider in control_sliders:
-                    if control_slider.name in sig.parameters.keys():
-                        params[control_slider.name] = control_slider.value
-                func_ = partial(func, **params)
+        for func, key, x, y in curve_data:
+            func.curve.setData(x=x, y=y, skipFiniteCheck=True, connect='all')
+            func._last_key = key  # Saved only once the curve is set, so that a failed evaluation is retried.
 
-                # Evaluate new data of func curve and update func curve.
-                data = func_(self.domain)
-                curve.setData(x=data[0], y=data[1])
+        for win, (x_auto, y_auto) in zip(self.gui_wins, auto_ranges):
+            win.palette.vb.blockSignals(False)
+            win.palette.vb.enableAutoRange(x=x_auto, y=y_auto)
+            win.palette.vb.updateAutoRange()
+            win.setUpdatesEnabled(True)
+
+
+_EVAL_CACHE_SIZE = 8  # Maximum number of the demo filter responses kept by :func:`_evaluate`
+_eval_cache = OrderedDict()  # Recently evaluated demo filter responses on ``_eval_domain``
+_eval_domain = None  # Domain of the responses in ``_eval_cache``
+
+
+def _evaluate(get_response, args, w, s=None):
+    """
+    Evaluate the response function ``get_response(*args)`` at ``w``, reusing a recent evaluation.
+
+    The magnitude, phase and nyquist windows evaluate the same filter on the same domain. The responses of the
+    recently evaluated filters are stored in ``_eval_cache`` so that the filter is evaluated once for all of the
+    windows; the response function is constructed only if the filter is not in the cache. The cache is emptied
+    whenever the domain ``w`` is changed, so the key of a response identifies the filter only.
+    """
+    key = (get_response,) + args
+    global _eval_domain
+    if w is not _eval_domain:
+        _eval_cache.clear()
+        _eval_domain = w
+    if key in _eval_cache:
+        _eval_cache.move_to_end(key)
+    else:
+        _eval_cache[key] = get_response(*args)(w, s=s)
+        if len(_eval_cache) > _EVAL_CACHE_SIZE:
+            _eval_cache.popitem(last=False)
+    return _eval_cache[key]
+
+
+def _butter_response(n):
+    """
+    Response function, see :func:`hs2response`, of the cached design of :math:`n^{th}` order Butterworth low-pass
+    filter.
+
+    The phase response is in radians so that the nyquist plots use it as is. It is converted to degrees only for the
+    phase plots.
+    """
+    a, b = _cached_butter(n)
+    return hs2response(coefficients2hs(a, b[::-1], n=n), deg=False)
+
+
+def _cheby_response(n, eps):
+    """
+    Response function, see :func:`hs2response`, of the cached design of :math:`n^{th}` order Chebyshev low-pass
+    filter with ``eps`` decibels ripple. The phase response is in radians, see :func:`_butter_response`.
+    """
+    a, b = _cached_cheby1(n, eps)
+    return hs2response(coefficients2hs(a, b[::-1], n=n), deg=False)
 
 
 def main():
@@ -250,60 +404,57 @@ if __name__ == '__main__':
     app = QApplication(sys.argv)
 
 
-    def butter_hw_mag(w, n=4):
+    def butter_hw_mag(w, n=4, s=None):
         n = int(n)
         if not hasattr(butter_hw_mag, 'label'):
             butter_hw_mag.label = 'mag'
-        a, b = signal.butter(n, 1., btype='low', analog=True)
-        filter_func = hw2hwmag(hs2hw(coefficients2hs(a, b[::-1], n=n)))
-        return w, filter_func(w)
+        return w, _evaluate(_butter_response, (n,), w, s)[0]
 
 
-    def butter_hw_phase(w, n=4):
+    def butter_hw_phase(w, n=4, s=None):
         n = int(n)
         if not hasattr(butter_hw_phase, 'label'):
             butter_hw_phase.label = 'phase'
-        a, b = signal.butter(n, 1., btype='low', analog=True)
-        filter_func = hw2hwphase(hs2hw(coefficients2hs(a, b[::-1], n=n)))
-        return w, filter_func(w)
+        return w, np.rad2deg(_evaluate(_butter_response, (n,), w, s)[1])
 
 
-    def cheby_hw_mag(w, n=4, eps=1.):
+    def cheby_hw_mag(w, n=4, eps=1., s=None):
         n = int(n)
+        eps = _quantize_ripple(eps)
         if not hasattr(cheby_hw_mag, 'label'):
             cheby_hw_mag.label = 'mag'
-        a, b = signal.cheby1(n, eps, 1., btype='low', analog=True)
-        filter_func = hw2hwmag(hs2hw(coefficients2hs(a, b[::-1], n=n)))
-        return w, filter_func(w)
+        return w, _evaluate(_cheby_response, (n, eps), w, s)[0]
 
 
-    def cheby_hw_phase(w, n=4, eps=1.):
+    def cheby_hw_phase(w, n=4, eps=1., s=None):
         n = int(n)
+        eps = _quantize_ripple(eps)
         if not hasattr(cheby_hw_phase, 'label'):
             cheby_hw_phase.label = 'phase'
-        a, b = signal.cheby1(n, eps, 1., btype='low', analog=True)
-        filter_func = hw2hwphase(hs2hw(coefficients2hs(a, b[::-1], n=n)))
-        return w, filter_func(w)
+        return w, np.rad2deg(_evaluate(_cheby_response, (n, eps), w, s)[1])
 
 
-    def butter_hw_nyquist(w, n=4):
+    def butter_hw_nyquist(w, n=4, s=None):
         n = int(n)
         if not hasattr(butter_hw_nyquist, 'label'):
             butter_hw_nyquist.label = 'nyquist'
-        _, theta = butter_hw_phase(w, n=n)
-        _, r = butter_hw_mag(w, n=n)
+        r, theta = _evaluate(_butter_response, (n,), w, s)
         return r * np.cos(theta), r * np.sin(theta)
 
 
-    def cheby_hw_nyquist(w, n=4, eps=1.):
+    def cheby_hw_nyquist(w, n=4, eps=1., s=None):
         n = int(n)
+        eps = _quantize_ripple(eps)
         if not hasattr(cheby_hw_nyquist, 'label'):
             cheby_hw_nyquist.label = 'nyquist'
-        _, theta = cheby_hw_phase(w, n=n, eps=eps)
-        _, r = cheby_hw_mag(w, n=n)
-        return r * np.cos(np.deg2rad(theta)), r * np.sin(np.deg2rad(theta))
+        r, theta = _evaluate(_cheby_response, (n, eps), w, s)
+        return r * np.cos(theta), r * np.sin(theta)
 
 
+    # The response functions are given the precomputed ``s``.
+    butter_hw_mag.shared = butter_hw_phase.shared = butter_hw_nyquist.shared = ('s',)
+    cheby_hw_mag.shared = cheby_hw_phase.shared = cheby_hw_nyquist.shared = ('s',)
+
     pair = ((butter_hw_mag, {'n': (1, 10)}),
             (butter_hw_phase, {'n': (1, 10)}),
             (cheby_hw_mag, {'n': (1, 10), 'eps': (0.1, 5.)}),
@@ -312,9 +463,8 @@ if __name__ == '__main__':
             (cheby_hw_nyquist, {'n': (1, 10), 'eps': (0.1, 5.)}))
 
     # Start the application
-    w = GUI(pair, domain=np.linspace(0, 5, 5000),
-            win_labels={'mag': ('Magnitude Response', 'w[rad/sec]', 'Magnitude'),
-                        'phase': ('Phase Response', 'w[rad/sec]', 'Phase[degree]'),
-                        'nyquist': ('Nyquist Plot', 'Amplitude', 'Amplitude')})
+    w = GUI(pair, win_labels={'mag': ('Magnitude Response', 'w[rad/sec]', 'Magnitude'),
+                              'phase': ('Phase Response', 'w[rad/sec]', 'Phase[degree]'),
+                              'nyquist': ('Nyquist Plot', 'Amplitude', 'Amplitude')})
     w.show()
     sys.exit(app.exec_())
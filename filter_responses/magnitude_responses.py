@@ -2,9 +2,8 @@
 :mod:`magnitude_response` module includes a GUI to compare the magnitude response of the lowpass filters.
 """
 from filter_responses.gui_widgets import *
-
-# Launch the Qt application.
-app = QApplication(sys.argv)
+from filter_responses.filter_prototypes import _quantize_ripple
+from functools import lru_cache
 
 
 def butter_analytic(w, n=2):
@@ -24,7 +23,21 @@ def butter_analytic(w, n=2):
         Magnitude response at ``w``
 
     """
-    return 1 / np.sqrt(1 + w ** (2 * n))
+    # The order is cast to int so that the power is computed by repeated multiplications, and the response is
+    # computed in place in a single buffer.
+    out = np.array(w, dtype=np.float64)
+    np.power(out, int(n), out=out)
+    np.hypot(1., out, out=out)
+    np.reciprocal(out, out=out)
+    return out
+
+
+@lru_cache(maxsize=128)
+def _cheby_eps(ripple):
+    """
+    Ripple factor of Chebyshev low-pass filter with ``ripple`` decibels ripple quantized by :func:`_quantize_ripple`.
+    """
+    return np.sqrt(10 ** (ripple / 10) - 1)
 
 
 def cheby_analytic(w, n=2, ripple=0.5):
@@ -45,23 +58,32 @@ def cheby_analytic(w, n=2, ripple=0.5):
     numpy.ndarray,
         Magnitude response at ``w``.
     """
-    epsilon = np.sqrt(10 ** (ripple / 10) - 1)
-    if abs(w) <= 1:
-        cheby_poly = np.cos(n * np.arccos(w))
-    else:
-        cheby_poly = np.cosh(n * np.arccosh(w))
-    return 1 / np.sqrt(1 + (epsilon * cheby_poly) ** 2)
+    n = int(n)
+    abs_w = np.abs(np.asarray(w))
+    epsilon = _cheby_eps(_quantize_ripple(ripple))  # Ripple is quantized as for the cached filter designs.
+
+    # Both branches of the Chebyshev polynomial are evaluated on the whole array and the proper one is selected.
+    cheby_poly = np.where(abs_w <= 1,
+                          np.cos(n * np.arccos(np.clip(abs_w, None, 1))),
+                          np.cosh(n * np.arccosh(np.clip(abs_w, 1, None))))
+    return 1 / np.hypot(1, epsilon * cheby_poly)
+
 
+def main():
+    # Launch the Qt application.
+    app = QApplication(sys.argv)
 
-# Control sliders of test function.
-pair = ((butter_analytic, {'n': (2, 10)}),
-        (cheby_analytic, {'n': (2, 10), 'ripple': (0.1, 5)}))
+    # Control sliders of test function.
+    pair = ((butter_analytic, {'n': (2, 10)}),
+            (cheby_analytic, {'n': (2, 10), 'ripple': (0.1, 5)}))
 
+    # Start the application
+    w = Widget(pair, domain=np.logspace(-1, 5, 1000), log_scale=True,
+               win_title='Filter Responses', plt_title='Butterworth and Chebyshev Filters',
+               xlabel='w[rad/sec]', ylabel='Magnitude')
+    w.show()
+    sys.exit(app.exec_())
 
-# Start the application
-w = Widget(pair, domain=np.logspace(-1, 5, 1000), log_scale=True,
-           win_title='Filter Responses', plt_title='Butterworth and Chebyshev Filters',
-           xlabel='w[rad/sec]', ylabel='Magnitude')
-w.show()
-sys.exit(app.exec_())
 
+if __name__ == '__main__':
+    main()
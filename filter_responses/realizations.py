@@ -1,9 +1,63 @@
 import numpy as np
-from numpy.polynomial import polynomial
 
 # TODO: Include Foster I-II and Cauer I-II realizations.
 
 
+def _last_nz(a):
+    """
+    Index of the last nonzero element of `a`, or -1 if `a` has no nonzero elements.
+
+    The index is found by :func:`numpy.argmax` on a reversed boolean view, without the index array of
+    :func:`numpy.nonzero`.
+    """
+    if a.size == 0:
+        return -1
+    nonzero = a[::-1] != 0
+    i = int(nonzero.argmax())
+    return a.size - 1 - i if nonzero[i] else -1
+
+
+def _continued_fractions(num, den, alphas):
+    """
+    Compute continued fractions of `num` and `den` into `alphas`.
+
+    Each polynomial division is performed in place by long division, so that no arrays are allocated per
+    division. `num` and `den` are used as scratch buffers and are overwritten by the remainders. The scaled
+    denominator and its multiples are written into two scratch buffers allocated once for all of the divisions.
+
+    Parameters
+    ----------
+    num : numpy.ndarray,
+        Numerator polynomial
+    den : numpy.ndarray
+        Denominator polynomial
+    alphas : numpy.ndarray
+        Coefficients of continued fractions of polynomials.
+    """
+    num_deg = _last_nz(num)
+    den_deg = _last_nz(den)
+    scaled_den_buf = np.empty(den.size)
+    prod_buf = np.empty(den.size)
+    for i in range(alphas.size):
+        scl = den[den_deg]
+        if scl == 0:
+            raise ZeroDivisionError("Continued fraction terminated before all coefficients are computed")
+
+        # Divide num by den. The quotient is left in num[den_deg:] and the remainder in num[:den_deg].
+        scaled_den = np.divide(den[:den_deg], scl, out=scaled_den_buf[:den_deg])
+        prod = prod_buf[:den_deg]
+        for j in range(num_deg, den_deg - 1, -1):
+            np.multiply(scaled_den, num[j], out=prod)
+            np.subtract(num[j - den_deg:j], prod, out=num[j - den_deg:j])
+        alphas[i] = num[den_deg + 1] / scl
+        num[den_deg:num_deg + 1] = 0
+
+        # Continue with the denominator and the remainder.
+        rem_deg = max(_last_nz(num[:den_deg]), 0)
+        num, den = den, num
+        num_deg, den_deg = den_deg, rem_deg
+
+
 def continued_fractions(num, den):
     """
     Compute continued fractions for polynomials `num` and `den`.
@@ -22,19 +76,23 @@ def continued_fractions(num, den):
 
     Raises
     ------
-    ValueError : is raised if degree of `den` is greate than that of `num`. 
+    ValueError : is raised if degree of `den` is not less than that of `num`.
     """
-    num_deg = np.nonzero(num)[0][-1]
-    den_deg = np.nonzero(den)[0][-1]
-    if den_deg > num_deg:
-        ValueError("Numerator degree must be grater than denominator degree")
+    num = np.asarray(num, dtype=float)
+    den = np.asarray(den, dtype=float)
+    num_deg = _last_nz(num)
+    den_deg = _last_nz(den)
+    if num_deg - den_deg < 1:
+        raise ValueError("Numerator degree must be grater than denominator degree")
 
     # Compute the coefficients
+    size = max(num.size, den.size)
+    num_buf = np.zeros(size)
+    den_buf = np.zeros(size)
+    num_buf[:num.size] = num
+    den_buf[:den.size] = den
     alphas = np.zeros(num_deg)
-    for i in range(num_deg):
-        quo, rem = polynomial.polydiv(num, den)
-        alphas[i] = quo[1]
-        num, den = den, rem
+    _continued_fractions(num_buf, den_buf, alphas)
 
     return alphas
 
@@ -59,15 +117,12 @@ def is_hurwitz(pol, get_cof=False):
         continued fraction coefficients are also returned.
     """
     # Construct even and odd polynomials.
-    p = pol.size - 1
-    even_idx = range(0, p + 1, 2)
-    odd_idx = range(1, p + 1, 2)
-    even_pol = np.zeros(p + 1)
-    odd_pol = np.zeros(p + 1)
-    even_pol[even_idx] = pol[even_idx]
-    odd_pol[odd_idx] = pol[odd_idx]
-    n = np.nonzero(odd_pol)[0][-1]
-    m = np.nonzero(even_pol)[0][-1]
+    even_pol = np.zeros(pol.size)
+    odd_pol = np.zeros(pol.size)
+    even_pol[::2] = pol[::2]
+    odd_pol[1::2] = pol[1::2]
+    n = _last_nz(odd_pol)
+    m = _last_nz(even_pol)
 
     # Determine numerator and denominator
     if m > n: